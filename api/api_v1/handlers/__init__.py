@@ -0,0 +1,4 @@
+from .notification import notification_router
+from .support_ticket import support_ticket
+
+__all__ = ["notification_router", "support_ticket"]
\ No newline at end of file
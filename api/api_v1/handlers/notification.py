@@ -1,7 +1,11 @@
 import logging
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
+from typing import Annotated, List
 
+import orjson
+from fastapi import APIRouter, HTTPException, Response, status
+from pydantic import Field
+
+from core.config import settings
 from schemas.notification import NotificationRequest, NotificationResponse
 from services.send_email_service import email_service
 
@@ -10,6 +14,13 @@ logger = logging.getLogger(__name__)
 
 notification_router = APIRouter()
 
+# Health check body never changes, so encode it once
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": "notification",
+    "message": "Notification service is running"
+})
+
 
 @notification_router.post(
     "/send",
@@ -35,7 +46,7 @@ async def send_notification(request: NotificationRequest) -> NotificationRespons
         HTTPException: If email sending fails
     """
     try:
-        logger.info(f"Received notification request for {request.email} with task {request.task}")
+        logger.info("Received notification request for %s with task %s", request.email, request.task)
         
         # Send the email using the email service
         result = await email_service.send_notification_email(request)
@@ -49,7 +60,7 @@ async def send_notification(request: NotificationRequest) -> NotificationRespons
         )
         
         if not result["success"]:
-            logger.error(f"Failed to send notification: {result['message']}")
+            logger.error("Failed to send notification: %s", result["message"])
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=result["message"]
@@ -60,13 +71,51 @@ async def send_notification(request: NotificationRequest) -> NotificationRespons
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in send_notification: {str(e)}")
+        logger.error("Unexpected error in send_notification: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error occurred while sending notification"
         )
 
 
+@notification_router.post(
+    "/send-batch",
+    response_model=List[NotificationResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Send a batch of notification emails",
+    description="Send several notification emails over a single SMTP connection"
+)
+async def send_notification_batch(
+    requests: Annotated[List[NotificationRequest], Field(max_length=settings.max_batch_size)]
+) -> List[NotificationResponse]:
+    """
+    Send a batch of notification emails.
+
+    Unlike /send, failures are reported per email instead of failing the whole
+    request, so callers can retry only the emails that were not sent.
+
+    Args:
+        requests: NotificationRequests to send (at most MAX_BATCH_SIZE; larger
+            batches are rejected with 422)
+
+    Returns:
+        One NotificationResponse per request, in request order
+    """
+    logger.info("Received batch notification request for %d emails", len(requests))
+
+    results = await email_service.send_many(requests)
+
+    return [
+        NotificationResponse(
+            success=result["success"],
+            message=result["message"],
+            email=result.get("email"),
+            task=result.get("task")
+        )
+        for result in results
+    ]
+
+
 @notification_router.get(
     "/health",
     status_code=status.HTTP_200_OK,
@@ -80,10 +129,4 @@ async def health_check():
     Returns:
         JSON response indicating service health
     """
-    return JSONResponse(
-        content={
-            "status": "healthy",
-            "service": "notification",
-            "message": "Notification service is running"
-        }
-    )
+    return Response(content=_HEALTH_BODY, media_type="application/json")
@@ -15,7 +15,7 @@ async def send_support_ticket_notification(request: SupportTicketRequest) -> Dic
     Send a support ticket notification email to the recipient.
     """
     try:
-        logger.info(f"Processing support ticket notification for ticket {request.ticket_id}")
+        logger.info("Processing support ticket notification for ticket %s", request.ticket_id)
         
         # Validate request data
         if not request.ticket_id or not request.user_email:
@@ -29,7 +29,7 @@ async def send_support_ticket_notification(request: SupportTicketRequest) -> Dic
         
         # Return appropriate response based on result
         if result["success"]:
-            logger.info(f"Support ticket emails sent successfully for ticket {request.ticket_id}")
+            logger.info("Support ticket emails sent successfully for ticket %s", request.ticket_id)
             return {
                 "success": True,
                 "message": "Support ticket processed successfully - confirmation sent to user and notification sent to support team",
@@ -46,7 +46,7 @@ async def send_support_ticket_notification(request: SupportTicketRequest) -> Dic
                 failed_parts.append("support team notification")
 
             error_message = f"Failed to send: {', '.join(failed_parts)}"
-            logger.error(f"Support ticket email failure for ticket {request.ticket_id}: {error_message}")
+            logger.error("Support ticket email failure for ticket %s: %s", request.ticket_id, error_message)
 
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -56,7 +56,7 @@ async def send_support_ticket_notification(request: SupportTicketRequest) -> Dic
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error processing support ticket {request.ticket_id}: {str(e)}")
+        logger.error("Unexpected error processing support ticket %s: %s", request.ticket_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error occurred while processing support ticket notification"
@@ -1,7 +1,6 @@
 from fastapi import APIRouter
 
-from .handlers.notification import notification_router
-from .handlers.support_ticket import support_ticket
+from .handlers import notification_router, support_ticket
 
 
 # Create main API v1 router
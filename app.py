@@ -1,13 +1,19 @@
 import logging
+import os
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
 from core.config import settings
 from core.logging_middleware import LoggingMiddleware
 from api import api_router
+from services.logging_client import logging_client
+from services.send_email_service import email_service
 
 
 # Load environment variables
@@ -18,6 +24,9 @@ logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
+# The log format doesn't use thread or process fields, so skip collecting them
+logging.logThreads = False
+logging.logProcesses = False
 logger = logging.getLogger(__name__)
 
 
@@ -25,8 +34,11 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("Starting Notification Service...")
+    logging_client.start()
     yield
     logger.info("Shutting down Notification Service...")
+    await logging_client.close()
+    await email_service.close()
 
 
 # Create FastAPI application
@@ -35,44 +47,57 @@ app = FastAPI(
     description="Microservice for sending email notifications",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc"
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure this properly for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Add CORS middleware (if enabled); service-to-service traffic doesn't need it
+if settings.enable_cors:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.allowed_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # Add logging middleware (if enabled)
 if settings.enable_request_logging:
     app.add_middleware(LoggingMiddleware, service_name="notification-service")
 
+# Add response compression. Registered last so it is the outermost middleware
+# and LoggingMiddleware still sees the uncompressed response body.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
 
+# Static bodies for the root and health endpoints, encoded once at import since
+# they are polled constantly by load balancers and orchestrators. A new Response
+# is built per request because middleware may mutate response headers in place.
+_ROOT_BODY = orjson.dumps({
+    "message": "Notification Service is running",
+    "service": settings.app_name,
+    "version": "1.0.0"
+})
+_HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": settings.app_name
+})
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
-        "message": "Notification Service is running",
-        "service": settings.app_name,
-        "version": "1.0.0"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "service": settings.app_name
-    }
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -81,5 +106,10 @@ if __name__ == "__main__":
         "app:app",
         host="0.0.0.0",
         port=8030,
-        reload=settings.debug
+        reload=settings.debug,
+        # "auto" picks uvloop and httptools when installed (uvloop isn't on Windows)
+        loop="auto",
+        http="auto",
+        # Reload mode runs a single process; use one worker per CPU otherwise
+        workers=1 if settings.debug else os.cpu_count()
     )
\ No newline at end of file
@@ -21,6 +21,9 @@ class Settings(BaseSettings):
     smtp_username: str = Field(...)
     smtp_password: str = Field(...)
     smtp_use_tls: bool = Field(default=True)
+    smtp_pool_size: int = Field(default=5)
+    # Maximum number of emails accepted by one /notifications/send-batch request
+    max_batch_size: int = Field(default=100)
     # smtp_use_ssl: bool = Field(default=False)  # Add SSL option
 
     # Email settings
@@ -28,8 +31,14 @@ class Settings(BaseSettings):
     from_name: str = Field(default="Notification Service")
     support_team_email: str = Field(default="support@example.com")
 
+    # CORS settings (only needed when browsers call the service directly)
+    enable_cors: bool = Field(default=False)
+    allowed_origins: list[str] = Field(default_factory=list)
+
     # Template settings
     template_dir: str = Field(default="templates")
+    # Directory for compiled template bytecode; empty uses Jinja's private per-user temp directory
+    template_cache_dir: str = Field(default="")
 
     # Logging service settings
     # logging_service_url: str = Field(default="http://logger-service:8020")
@@ -38,6 +47,9 @@ class Settings(BaseSettings):
     log_request_body: bool = Field(default=True)
     log_response_body: bool = Field(default=True)
     max_log_body_size: int = Field(default=10000)
+    log_batch_size: int = Field(default=100)
+    log_flush_interval: float = Field(default=1.0)
+    log_queue_size: int = Field(default=10000)
 
 
 # Global settings instance
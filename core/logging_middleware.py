@@ -1,13 +1,13 @@
-import asyncio
 import json
 import time
 import logging
 import re
-from typing import Callable, Dict, Any, Optional
+from functools import lru_cache
+from typing import ClassVar, Dict, Any, Iterable, Optional, Tuple, Union
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import StreamingResponse
+import orjson
+from starlette.datastructures import QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from services.logging_client import logging_client, LogCreate
 from core.config import settings
@@ -16,11 +16,100 @@ from core.config import settings
 logger = logging.getLogger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all API requests and responses to the logging microservice."""
-
-    def __init__(self, app, service_name: str = "notification-service"):
-        super().__init__(app)
+def _ci(word: str) -> str:
+    """Build a case-insensitive pattern for an ASCII word without re.IGNORECASE."""
+    return "".join(f"[{c.upper()}{c.lower()}]" if c.isalpha() else re.escape(c) for c in word)
+
+
+# Sensitive key=value / key: value pairs in form data and query strings.
+# Explicit [Xx] classes match faster than the re.IGNORECASE engine.
+_MASK_KV_RE = re.compile(
+    "(" + "|".join([
+        _ci("password"), _ci("passwd"), _ci("pwd"), _ci("token"), _ci("secret"), _ci("key"),
+        _ci("api") + "[_-]?" + _ci("key"), _ci("access") + "[_-]?" + _ci("token"),
+    ]) + r")([=:]\s*)([^&\s\n\r]+)"
+)
+# Credit card numbers (basic)
+_MASK_CC_RE = re.compile(r'\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}')
+# Cheap probe for any of the above; most bodies contain none of them
+_MASK_PROBE_RE = re.compile(
+    "|".join(_ci(word) for word in ("pwd", "passw", "token", "secret", "key")) + r"|\d{4}[-\s]?\d{4}"
+)
+
+# JSON field names whose values are masked (matched as substrings of the lowercased key)
+_SENSITIVE_FIELDS = frozenset({
+    # Password related
+    "password", "passwd", "pwd", "pass", "passphrase",
+    "confirm_password", "new_password", "old_password", "current_password",
+    "password_confirmation", "password_confirm", "repeat_password",
+
+    # Authentication tokens
+    "token", "access_token", "refresh_token", "auth_token", "bearer_token",
+    "jwt", "jwt_token", "session_token", "csrf_token", "xsrf_token",
+
+    # API keys and secrets
+    "secret", "api_key", "apikey", "api_secret", "client_secret",
+    "private_key", "public_key", "encryption_key", "signing_key",
+
+    # Authentication
+    "auth", "authorization", "credential", "credentials",
+    "session", "session_id", "cookie", "cookies",
+
+    # Personal information
+    "pin", "ssn", "social_security", "social_security_number",
+    "credit_card", "card_number", "card_num", "cvv", "cvc", "cvv2",
+    "bank_account", "account_number", "routing_number",
+
+    # Other sensitive data
+    "otp", "verification_code", "reset_code", "activation_code",
+    "security_question", "security_answer", "backup_codes"
+})
+# Shortest keywords covering every sensitive field: a key contains a sensitive
+# field name exactly when it contains one of these
+_SENSITIVE_FIELD_KEYWORDS = sorted(
+    field for field in _SENSITIVE_FIELDS
+    if not any(other != field and other in field for other in _SENSITIVE_FIELDS)
+)
+# Used to prefilter raw bodies
+_SENSITIVE_FIELD_PROBES = tuple(keyword.encode() for keyword in _SENSITIVE_FIELD_KEYWORDS)
+# Single-pass matcher for field names
+_SENSITIVE_FIELD_RE = re.compile("|".join(map(re.escape, _SENSITIVE_FIELD_KEYWORDS)))
+
+
+class LoggingMiddleware:
+    """Pure ASGI middleware to log all API requests and responses to the logging microservice."""
+
+    _DEFAULT_EXCLUDED_PATHS: ClassVar[frozenset] = frozenset({
+        "/health",
+        "/api/v1/notifications/health",
+        "/metrics",
+        "/docs",
+        "/redoc",
+        "/openapi.json",
+        "/favicon.ico",
+        "/"
+    })
+
+    _SENSITIVE_HEADERS: ClassVar[frozenset] = frozenset({
+        "authorization",
+        "cookie",
+        "x-api-key",
+        "x-auth-token",
+        "x-access-token"
+    })
+
+    # Log JSON and text content types
+    _LOGGABLE_CONTENT_TYPES: ClassVar[frozenset] = frozenset({
+        "application/json",
+        "application/x-www-form-urlencoded",
+        "text/plain",
+        "text/html",
+        "text/xml",
+        "application/xml"
+    })
+
+    def __init__(self, app: ASGIApp, service_name: str = "notification-service"):
+        self.app = app
         self.service_name = service_name
         self.enabled = settings.enable_request_logging
         self.log_request_body = getattr(settings, 'log_request_body', True)
@@ -28,136 +117,165 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         self.max_body_size = getattr(settings, 'max_log_body_size', 10000)
 
         # Paths to exclude from logging (health checks, metrics, etc.)
-        self.excluded_paths = {
-            "/health",
-            "/metrics",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/favicon.ico",
-            "/"
-        }
-        
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request and log to logging microservice."""
-
-        if not self.enabled:
-            return await call_next(request)
+        self.excluded_paths = self._DEFAULT_EXCLUDED_PATHS
 
-        # Skip logging for excluded paths
-        if request.url.path in self.excluded_paths:
-            return await call_next(request)
-
-        start_time = time.time()
+        # With no bodies to log, only method, path and status are recorded
+        self._minimal = not (self.log_request_body or self.log_response_body)
 
-        # Capture request data
-        request_data = await self._capture_request_data(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process request and log to logging microservice."""
 
-        # Process the request
-        response = await call_next(request)
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
 
-        # Calculate processing time
-        processing_time = int((time.time() - start_time) * 1000)  # Convert to milliseconds
+        # Skip logging for excluded paths
+        if scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
 
-        # Capture response data
-        response_data = await self._capture_response_data(response)
+        if self._minimal:
+            await self._log_minimal(scope, receive, send)
+            return
 
-        # Create log entry asynchronously (fire and forget)
-        asyncio.create_task(self._log_request_response(
-            request, response, request_data, response_data, processing_time
-        ))
+        start_ns = time.perf_counter_ns()
 
-        return response
-    
-    async def _capture_request_data(self, request: Request) -> Dict[str, Any]:
+        # Capture request data
+        request_data = self._capture_request_data(scope)
+        headers = request_data["headers"]
+
+        # Request body chunks are teed into a bounded buffer as the app reads them
+        capture_request_body = (
+            self.log_request_body and self._should_log_body(headers.get("content-type"))
+        )
+        if capture_request_body:
+            # Don't buffer bodies we already know are too large to log
+            content_length = headers.get("content-length")
+            if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+                request_data["request_body"] = f"<body too large: {content_length} bytes>"
+                capture_request_body = False
+
+        request_buffer = bytearray()
+        request_size = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                request_size += len(chunk)
+                remaining = self.max_body_size - len(request_buffer)
+                if remaining > 0:
+                    request_buffer.extend(chunk[:remaining])
+            return message
+
+        response_data: Dict[str, Any] = {"status_code": None, "response_body": None}
+        capture_response_body = self.log_response_body
+        response_buffer = bytearray()
+        response_size = 0
+        response_chunks = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal capture_response_body, response_size, response_chunks
+            if message["type"] == "http.response.start":
+                response_data["status_code"] = message["status"]
+                await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            response_chunks += 1
+            if capture_response_body and response_chunks == 1 and message.get("more_body", False):
+                # Body sent in several messages: a streaming response, which isn't buffered
+                response_data["response_body"] = "<streaming response>"
+                capture_response_body = False
+
+            if capture_response_body:
+                chunk = message.get("body", b"")
+                response_size += len(chunk)
+                remaining = self.max_body_size - len(response_buffer)
+                if remaining > 0:
+                    response_buffer.extend(chunk[:remaining])
+
+            await send(message)
+
+            if not message.get("more_body", False):
+                # Calculate processing time
+                processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000  # Convert to milliseconds
+
+                if capture_request_body:
+                    request_data["request_body"] = self._capture_body(request_buffer, request_size)
+                if capture_response_body:
+                    response_data["response_body"] = self._capture_body(response_buffer, response_size)
+
+                # Queue the log entry; it is shipped in the background with other entries
+                self._log_request_response(request_data, response_data, processing_time)
+
+        await self.app(scope, receive_wrapper if capture_request_body else receive, send_wrapper)
+
+    async def _log_minimal(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Log only method, path, status and timing, skipping header and body capture."""
+        start_ns = time.perf_counter_ns()
+        status_code = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            await send(message)
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                processing_time = (time.perf_counter_ns() - start_ns) // 1_000_000  # Convert to milliseconds
+                try:
+                    logging_client.enqueue(LogCreate(
+                        service_name=self.service_name,
+                        method=scope["method"],
+                        path=scope["path"],
+                        status_code=status_code,
+                        processing_time=processing_time
+                    ))
+                except Exception as e:
+                    # Log the error but don't fail the request
+                    logger.error(f"Failed to log request: {str(e)}")
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _capture_request_data(self, scope: Scope) -> Dict[str, Any]:
         """Capture request data for logging."""
-        data = {
-            "method": request.method,
-            "path": request.url.path,
-            "query_params": dict(request.query_params) if request.query_params else None,
-            "headers": dict(request.headers),
-            "client_ip": self._get_client_ip(request),
-            "user_agent": request.headers.get("user-agent"),
+        query_string = scope.get("query_string", b"")
+        headers = self._filter_sensitive_headers(scope["headers"])
+        return {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_params": dict(QueryParams(query_string)) if query_string else None,
+            "headers": headers,
+            "client_ip": self._get_client_ip(scope, headers),
+            "user_agent": headers.get("user-agent"),
             "request_body": None
         }
 
-        # Capture request body if enabled and content type is appropriate
-        if self.log_request_body and self._should_log_body(request.headers.get("content-type")):
-            try:
-                body = await request.body()
-                if body and len(body) <= self.max_body_size:
-                    # Try to decode as JSON first, then as text
-                    try:
-                        body_json = json.loads(body.decode('utf-8'))
-                        # Mask sensitive fields in JSON body
-                        masked_body = self._mask_sensitive_data(body_json)
-                        data["request_body"] = json.dumps(masked_body)
-                    except (json.JSONDecodeError, UnicodeDecodeError):
-                        try:
-                            body_text = body.decode('utf-8')
-                            # Mask sensitive data in text body (form data, etc.)
-                            data["request_body"] = self._mask_sensitive_text(body_text)
-                        except UnicodeDecodeError:
-                            data["request_body"] = f"<binary data: {len(body)} bytes>"
-                elif len(body) > self.max_body_size:
-                    data["request_body"] = f"<body too large: {len(body)} bytes>"
-            except Exception as e:
-                data["request_body"] = f"<error reading body: {str(e)}>"
-
-        return data
-
-    async def _capture_response_data(self, response: Response) -> Dict[str, Any]:
-        """Capture response data for logging."""
-        data = {
-            "status_code": response.status_code,
-            "response_body": None
-        }
+    def _capture_body(self, body: bytearray, size: int) -> Optional[str]:
+        """Render a captured request/response body for logging."""
+        if not body:
+            return None
+        if size > self.max_body_size:
+            return f"<body too large: {size} bytes>"
+
+        try:
+            # Buffers never exceed max_body_size; format them without copying
+            return _format_body(body)
+        except Exception as e:
+            return f"<error reading body: {str(e)}>"
 
-        # Capture response body if enabled
-        if self.log_response_body and hasattr(response, 'body'):
-            try:
-                if isinstance(response, StreamingResponse):
-                    # For streaming responses, we can't easily capture the body
-                    data["response_body"] = "<streaming response>"
-                else:
-                    body = response.body
-                    if body and len(body) <= self.max_body_size:
-                        # Try to decode as JSON first, then as text
-                        try:
-                            # Convert body to bytes if it's not already
-                            body_bytes = body if isinstance(body, bytes) else bytes(body)
-                            response_json = json.loads(body_bytes.decode('utf-8'))
-                            # Mask sensitive fields in JSON response (like tokens)
-                            masked_response = self._mask_sensitive_data(response_json)
-                            data["response_body"] = json.dumps(masked_response)
-                        except (json.JSONDecodeError, UnicodeDecodeError):
-                            try:
-                                body_bytes = body if isinstance(body, bytes) else bytes(body)
-                                response_text = body_bytes.decode('utf-8')
-                                # Mask sensitive data in text response
-                                data["response_body"] = self._mask_sensitive_text(response_text)
-                            except UnicodeDecodeError:
-                                data["response_body"] = f"<binary data: {len(body)} bytes>"
-                    elif len(body) > self.max_body_size:
-                        data["response_body"] = f"<body too large: {len(body)} bytes>"
-            except Exception as e:
-                data["response_body"] = f"<error reading response body: {str(e)}>"
-
-        return data
-
-    async def _log_request_response(
+    def _log_request_response(
         self,
-        request: Request,
-        response: Response,
         request_data: Dict[str, Any],
         response_data: Dict[str, Any],
         processing_time: int
     ):
-        """Send log entry to the logger service."""
+        """Queue a log entry for the logger service."""
         try:
-            # Filter sensitive headers
-            headers = self._filter_sensitive_headers(request_data["headers"])
-
             log_entry = LogCreate(
                 service_name=self.service_name,
                 method=request_data["method"],
@@ -169,151 +287,141 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 processing_time=processing_time,
                 client_ip=request_data["client_ip"],
                 user_agent=request_data["user_agent"],
-                headers=headers
+                headers=request_data["headers"]
             )
 
-            # Send to logger service (non-blocking)
-            await logging_client.create_log_entry(log_entry)
+            # Hand off to the batching logging client (non-blocking)
+            logging_client.enqueue(log_entry)
 
         except Exception as e:
             # Log the error but don't fail the request
             logger.error(f"Failed to log request: {str(e)}")
 
-    def _get_client_ip(self, request: Request) -> Optional[str]:
+    def _get_client_ip(self, scope: Scope, headers: Dict[str, str]) -> Optional[str]:
         """Extract client IP from request headers."""
         # Check for forwarded headers first (for reverse proxies)
-        forwarded_for = request.headers.get("x-forwarded-for")
+        forwarded_for = headers.get("x-forwarded-for")
         if forwarded_for:
             return forwarded_for.split(",")[0].strip()
 
-        real_ip = request.headers.get("x-real-ip")
+        real_ip = headers.get("x-real-ip")
         if real_ip:
             return real_ip
 
         # Fall back to direct client IP
-        if hasattr(request, "client") and request.client:
-            return request.client.host
+        client = scope.get("client")
+        if client:
+            return client[0]
 
         return None
-    
+
     def _should_log_body(self, content_type: Optional[str]) -> bool:
         """Determine if we should log the request/response body based on content type."""
         if not content_type:
             return False
 
-        # Log JSON and text content types
-        loggable_types = [
-            "application/json",
-            "application/x-www-form-urlencoded",
-            "text/plain",
-            "text/html",
-            "text/xml",
-            "application/xml"
-        ]
-
-        return any(content_type.startswith(t) for t in loggable_types)
-
-    def _filter_sensitive_headers(self, headers: Dict[str, str]) -> Dict[str, str]:
-        """Filter out sensitive headers from logging."""
-        sensitive_headers = {
-            "authorization",
-            "cookie",
-            "x-api-key",
-            "x-auth-token",
-            "x-access-token"
-        }
+        # Compare the media type without parameters such as charset
+        return content_type.split(";", 1)[0].strip().lower() in self._LOGGABLE_CONTENT_TYPES
+
+    def _filter_sensitive_headers(self, raw_headers: Iterable[Tuple[bytes, bytes]]) -> Dict[str, str]:
+        """Decode ASGI headers in a single pass, filtering out sensitive headers from logging."""
+        filtered: Dict[str, str] = {}
+        # ASGI header names are already lowercase; repeated headers keep their first value
+        for raw_key, raw_value in raw_headers:
+            key = raw_key.decode("latin-1")
+            if key not in filtered:
+                filtered[key] = "<redacted>" if key in self._SENSITIVE_HEADERS else raw_value.decode("latin-1")
+        return filtered
 
-        filtered = {}
-        for key, value in headers.items():
-            if key.lower() in sensitive_headers:
-                filtered[key] = "<redacted>"
-            else:
-                filtered[key] = value
 
-        return filtered
-    
-    def _mask_sensitive_data(self, data: Any) -> Any:
-        """Recursively mask sensitive data in JSON objects."""
-        if isinstance(data, dict):
-            masked_data = {}
-            for key, value in data.items():
-                if self._is_sensitive_field(key):
-                    masked_data[key] = self._mask_value(value)
+def _format_body(body: Union[bytes, bytearray]) -> str:
+    """Decode a body as JSON or text and mask sensitive data in it."""
+    # Try to parse as JSON first (orjson reads the bytes directly), then as text.
+    # Either way the body is decoded at most once.
+    try:
+        body_json = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        try:
+            text = body.decode('utf-8')
+        except UnicodeDecodeError:
+            return f"<binary data: {len(body)} bytes>"
+        return _format_text_body(body, text)
+
+    # Mask sensitive fields in JSON body. Only re-encode when something was
+    # masked; otherwise the (already validated UTF-8) original is logged as is.
+    if _may_contain_sensitive_field(body) and _mask_inplace(body_json):
+        return orjson.dumps(body_json).decode()
+    return body.decode('utf-8')
+
+
+def _format_text_body(body: Union[bytes, bytearray], text: str) -> str:
+    """Mask a body orjson rejected: lenient JSON (NaN, Infinity, lone surrogates) or plain text."""
+    # The stdlib parser accepts the non-standard JSON orjson rejects; masking it as text
+    # would miss "key": value pairs and leak their values
+    try:
+        body_json = json.loads(text)
+    except ValueError:
+        # Mask sensitive data in text body (form data, etc.)
+        return _mask_sensitive_text(text)
+
+    if _may_contain_sensitive_field(body) and _mask_inplace(body_json):
+        return json.dumps(body_json, separators=(',', ':'))
+    return text
+
+
+def _may_contain_sensitive_field(body: Union[bytes, bytearray]) -> bool:
+    """Return False only if no key in the raw JSON body can be a sensitive field."""
+    # Escaped or non-ASCII keys may lowercase to a sensitive name; always walk those
+    if not body.isascii() or b"\\u" in body:
+        return True
+
+    body_lower = body.lower()
+    return any(probe in body_lower for probe in _SENSITIVE_FIELD_PROBES)
+
+
+def _mask_inplace(data: Any) -> bool:
+    """Mask sensitive values in a parsed JSON object, in place, without recursion.
+
+    Returns True if any sensitive field was found.
+    """
+    masked = False
+    stack = [data]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            for key, value in current.items():
+                if _is_sensitive_field(key):
+                    current[key] = _mask_value(value)
+                    masked = True
                 elif isinstance(value, (dict, list)):
-                    masked_data[key] = self._mask_sensitive_data(value)
-                else:
-                    masked_data[key] = value
-            return masked_data
-        elif isinstance(data, list):
-            return [self._mask_sensitive_data(item) for item in data]
-        else:
-            return data
-
-    def _is_sensitive_field(self, field_name: str) -> bool:
-        """Check if a field name contains sensitive data."""
-        sensitive_fields = {
-            # Password related
-            "password", "passwd", "pwd", "pass", "passphrase",
-            "confirm_password", "new_password", "old_password", "current_password",
-            "password_confirmation", "password_confirm", "repeat_password",
-
-            # Authentication tokens
-            "token", "access_token", "refresh_token", "auth_token", "bearer_token",
-            "jwt", "jwt_token", "session_token", "csrf_token", "xsrf_token",
-
-            # API keys and secrets
-            "secret", "api_key", "apikey", "api_secret", "client_secret",
-            "private_key", "public_key", "encryption_key", "signing_key",
-
-            # Authentication
-            "auth", "authorization", "credential", "credentials",
-            "session", "session_id", "cookie", "cookies",
-
-            # Personal information
-            "pin", "ssn", "social_security", "social_security_number",
-            "credit_card", "card_number", "card_num", "cvv", "cvc", "cvv2",
-            "bank_account", "account_number", "routing_number",
-
-            # Other sensitive data
-            "otp", "verification_code", "reset_code", "activation_code",
-            "security_question", "security_answer", "backup_codes"
-        }
+                    stack.append(value)
+        elif isinstance(current, list):
+            stack.extend(item for item in current if isinstance(item, (dict, list)))
+    return masked
 
-        field_lower = field_name.lower()
-        return any(sensitive in field_lower for sensitive in sensitive_fields)
 
-    def _mask_value(self, value: Any) -> Any:
-        """Mask a sensitive value."""
-        if value is None:
-            return None
+@lru_cache(maxsize=1024)
+def _is_sensitive_field(field_name: str) -> bool:
+    """Check if a field name contains sensitive data."""
+    return _SENSITIVE_FIELD_RE.search(field_name.lower()) is not None
+
+
+def _mask_value(value: Any) -> Any:
+    """Mask a sensitive value."""
+    if value is None:
+        return None
+
+    # Replace sensitive values with a fixed token to avoid leaking length/format info
+    return "<redacted>"
+
+
+def _mask_sensitive_text(text: str) -> str:
+    """Mask sensitive data in text format (form data, query strings, etc.)."""
+    if not _MASK_PROBE_RE.search(text):
+        return text
 
-         # Replace sensitive values with a fixed token to avoid leaking length/format info
-        return "<redacted>"
-
-    def _mask_sensitive_text(self, text: str) -> str:
-        """Mask sensitive data in text format (form data, query strings, etc.)."""
-        # Common patterns for form data and query strings
-        patterns = [
-            # password=value or password:value
-            (r'(password[=:]\s*)([^&\s\n\r]+)', r'\1***'),
-            (r'(passwd[=:]\s*)([^&\s\n\r]+)', r'\1***'),
-            (r'(pwd[=:]\s*)([^&\s\n\r]+)', r'\1***'),
-            # token=value or token:value
-            (r'(token[=:]\s*)([^&\s\n\r]+)', r'\1***'),
-            (r'(secret[=:]\s*)([^&\s\n\r]+)', r'\1***'),
-            (r'(key[=:]\s*)([^&\s\n\r]+)', r'\1***'),
-            # API key patterns
-            (r'(api[_-]?key[=:]\s*)([^&\s\n\r]+)', r'\1***'),
-            (r'(access[_-]?token[=:]\s*)([^&\s\n\r]+)', r'\1***'),
-            # Credit card patterns (basic)
-            (r'(\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4})', r'****-****-****-****'),
-        ]
-
-        masked_text = text
-        for pattern, replacement in patterns:
-            masked_text = re.sub(pattern, replacement, masked_text, flags=re.IGNORECASE)
-
-        return masked_text
+    masked_text = _MASK_KV_RE.sub(r"\1\2***", text)
+    return _MASK_CC_RE.sub("****-****-****-****", masked_text)
 
 
 class RequestLoggingConfig:
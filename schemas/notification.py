@@ -1,6 +1,6 @@
 from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class NotificationTask(str, Enum):
@@ -27,8 +27,9 @@ class NotificationRequest(BaseModel):
     user_name: str = Field(..., description="Name of the user")
     subject: str = Field(..., description="Email subject line")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        json_schema_extra={
             "example": {
                 "email": "user@example.com",
                 "task": "email_verification",
@@ -37,6 +38,7 @@ class NotificationRequest(BaseModel):
                 "subject": "Please verify your email address"
             }
         }
+    )
 
 
 class SupportTicketRequest(NotificationRequest):
@@ -48,8 +50,9 @@ class SupportTicketRequest(NotificationRequest):
     description: str = Field(..., description="Detailed issue description")
     due_date: Optional[str] = Field(None, description="Expected resolution date/time")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        json_schema_extra={
             "example": {
                 "email": "support@example.com",
                 "task": "support_ticket",
@@ -64,6 +67,7 @@ class SupportTicketRequest(NotificationRequest):
                 "due_date": "2023-06-20T18:00:00Z"
             }
         }
+    )
 
 
 class NotificationResponse(BaseModel):
@@ -73,8 +77,9 @@ class NotificationResponse(BaseModel):
     email: Optional[EmailStr] = Field(None, description="Email address that was notified")
     task: Optional[NotificationTask] = Field(None, description="Task that was processed")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        json_schema_extra={
             "example": {
                 "success": True,
                 "message": "Email sent successfully",
@@ -82,3 +87,4 @@ class NotificationResponse(BaseModel):
                 "task": "email_verification"
             }
         }
+    )
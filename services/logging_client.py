@@ -1,11 +1,14 @@
-import json
+import asyncio
+import importlib.util
+import random
 import time
 import logging
-from typing import Dict, Any, Optional, List
+from collections import deque
+from typing import Deque, Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
 import httpx
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 from core.config import settings
 
@@ -45,6 +48,13 @@ class LogRead(BaseModel):
     timestamp: datetime
 
 
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Validate/serialize log lists straight to and from JSON bytes in pydantic-core
+_LOG_CREATE_LIST = TypeAdapter(List[LogCreate])
+_LOG_READ_LIST = TypeAdapter(List[LogRead])
+
+
 class LoggingClient:
     """Client for interacting with the logging microservice."""
 
@@ -52,49 +62,238 @@ class LoggingClient:
         # if base_url is None:
         #     base_url = settings.logging_service_url
         self.base_url = base_url.rstrip("/")
-        self.client = httpx.AsyncClient(timeout=5.0)
-        
+        # Single long-lived client so connections to the logging service are reused.
+        # HTTP/2 multiplexes concurrent posts over one connection; it is negotiated
+        # via ALPN on https URLs, and plain http or servers without h2 use HTTP/1.1.
+        # Without the h2 package installed, stay on HTTP/1.1 instead of failing.
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(5.0, connect=1.0),
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=128, keepalive_expiry=60.0),
+            headers={"Content-Type": "application/json"}
+        )
+
+        # Entries queued by enqueue() are shipped in batches by a background task
+        self.batch_size = settings.log_batch_size
+        self.flush_interval = settings.log_flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        # Entries dropped under backpressure since the last flush
+        self._dropped = 0
+        # Oldest backlog entries evicted to make room since the last flush
+        self._evicted = 0
+
+        # Circuit breaker: after a failure, calls are skipped until _circuit_open_until
+        # and undelivered batches are kept in a bounded backlog for the next attempt
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+        self._backlog: Deque[LogCreate] = deque(maxlen=settings.log_queue_size)
+
+    def start(self) -> None:
+        """Start (or restart) the background task that ships queued log entries."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=settings.log_queue_size)
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._flusher())
+
+    def enqueue(self, log_data: LogCreate) -> None:
+        """Queue a log entry for the next batch without waiting on the logging service."""
+        # Started lazily so entries aren't lost when the app lifespan didn't run
+        if self._flusher_task is None or self._flusher_task.done():
+            self.start()
+
+        try:
+            self._queue.put_nowait(log_data)
+        except asyncio.QueueFull:
+            # Reported once per batch by the flusher, not per dropped entry
+            self._dropped += 1
+            logger.debug("Log queue is full; dropping log entry")
+
+    async def _flusher(self) -> None:
+        """Collect queued entries into batches of up to batch_size or flush_interval seconds."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._backlog:
+                # Retry spilled entries once the circuit closes, even if nothing new arrives
+                retry_in = max(self._circuit_open_until - time.monotonic(), self.flush_interval)
+                try:
+                    batch = [await asyncio.wait_for(self._queue.get(), retry_in)]
+                except asyncio.TimeoutError:
+                    batch = []
+            else:
+                batch = [await self._queue.get()]
+
+            deadline = loop.time() + self.flush_interval
+            while batch and len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+            if self._dropped:
+                logger.warning("Dropped %d log entries while the log queue was full", self._dropped)
+                self._dropped = 0
+            if self._evicted:
+                logger.warning(
+                    "Evicted %d log entries from the retry backlog while the logging service was unavailable",
+                    self._evicted
+                )
+                self._evicted = 0
+
+    async def _flush(self, batch: List[LogCreate]) -> None:
+        """Ship spilled and new entries in bulk requests, spilling them again if the service is down."""
+        pending = [*self._backlog, *batch]
+        self._backlog.clear()
+
+        for start in range(0, len(pending), self.batch_size):
+            _, retry = await self._post_bulk(pending[start:start + self.batch_size])
+            if retry:
+                self._spill(pending[start:])
+                return
+
+    def _spill(self, logs: List[LogCreate]) -> None:
+        """Keep entries for a later retry; the oldest are dropped once the backlog is full."""
+        overflow = len(self._backlog) + len(logs) - self._backlog.maxlen
+        if overflow > 0:
+            self._evicted += overflow
+        self._backlog.extend(logs)
+
+    def _circuit_open(self) -> bool:
+        """Whether calls to the logging service are paused after recent failures."""
+        return time.monotonic() < self._circuit_open_until
+
+    def _record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+
+    def _record_failure(self) -> None:
+        """Pause calls with jittered exponential backoff (capped at 30s) after a failure."""
+        self._consecutive_failures += 1
+        cooldown = min(30.0, 2.0 ** min(self._consecutive_failures, 5)) * random.uniform(0.5, 1.0)
+        self._circuit_open_until = time.monotonic() + cooldown
+        logger.warning(
+            "Logging service unavailable (%d consecutive failures); pausing calls for %.1fs",
+            self._consecutive_failures, cooldown
+        )
+
     async def create_log_entry(self, log_data: LogCreate) -> Optional[LogRead]:
-        """Create a new log entry in the logging microservice."""
+        """
+        Create a new log entry in the logging microservice and return the created row.
+
+        This waits on a round-trip per entry; use enqueue() to ship entries in batches
+        when the created row isn't needed. Returns None without calling the service
+        while the circuit is open, and when the service accepts the entry without
+        returning it.
+        """
+        if self._circuit_open():
+            return None
+
         try:
             response = await self.client.post(
-                f"{self.base_url}/api/v1/logs/",
-                json=log_data.model_dump(),
-                headers={"Content-Type": "application/json"}
+                "/api/v1/logs/",
+                content=log_data.model_dump_json()
             )
-            
-            if response.status_code == 200:
-                return LogRead(**response.json())
+        except httpx.TransportError as e:
+            logger.error(f"Error creating log entry: {str(e)}")
+            self._record_failure()
+            return None
+        except Exception as e:
+            logger.error(f"Error creating log entry: {str(e)}")
+            return None
+
+        if response.is_server_error:
+            logger.error(f"Failed to create log entry: {response.status_code} - {response.text}")
+            self._record_failure()
+            return None
+        self._record_success()
+
+        try:
+            if response.is_success:
+                # Accepted without echoing the row (e.g. 204 No Content): nothing to return
+                if not response.content:
+                    return None
+                return LogRead.model_validate_json(response.content)
             else:
                 logger.error(f"Failed to create log entry: {response.status_code} - {response.text}")
                 return None
-                
+
         except Exception as e:
             logger.error(f"Error creating log entry: {str(e)}")
             return None
     
     async def create_bulk_logs(self, logs: List[LogCreate]) -> Optional[List[LogRead]]:
         """Create multiple log entries in a single request."""
+        created, _ = await self._post_bulk(logs)
+        return created
+
+    async def _post_bulk(self, logs: List[LogCreate]) -> Tuple[Optional[List[LogRead]], bool]:
+        """
+        Post entries to the bulk endpoint.
+
+        Returns the created rows (None on failure) and whether the entries were not
+        delivered because the service is unavailable, i.e. should be retried later.
+        """
+        if self._circuit_open():
+            return None, True
+
         try:
             response = await self.client.post(
-                f"{self.base_url}/api/v1/logs/bulk",
-                json=[log.model_dump() for log in logs],
-                headers={"Content-Type": "application/json"}
+                "/api/v1/logs/bulk",
+                content=_LOG_CREATE_LIST.dump_json(logs)
             )
-            
-            if response.status_code == 200:
-                return [LogRead(**log_data) for log_data in response.json()]
+        except httpx.TransportError as e:
+            logger.error(f"Error creating bulk logs: {str(e)}")
+            self._record_failure()
+            return None, True
+        except Exception as e:
+            logger.error(f"Error creating bulk logs: {str(e)}")
+            return None, False
+
+        if response.is_server_error:
+            logger.error(f"Failed to create bulk logs: {response.status_code} - {response.text}")
+            self._record_failure()
+            return None, True
+        self._record_success()
+
+        # The service answered, so the entries must not be resent even if the reply is unusable
+        try:
+            if response.is_success:
+                # Accepted without echoing the rows (e.g. 204 No Content)
+                if not response.content:
+                    return [], False
+                return _LOG_READ_LIST.validate_json(response.content), False
             else:
                 logger.error(f"Failed to create bulk logs: {response.status_code} - {response.text}")
-                return None
-                
+                return None, False
+
         except Exception as e:
             logger.error(f"Error creating bulk logs: {str(e)}")
-            return None
+            return None, False
     
     
     async def close(self):
-        """Close the HTTP client."""
+        """Flush queued log entries and close the HTTP client."""
+        if self._flusher_task is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.flush_interval + 5.0)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self._queue.qsize()} unsent log entries on shutdown")
+            self._flusher_task.cancel()
+            self._flusher_task = None
+            self._queue = None
+
+        if self._backlog:
+            logger.warning(f"Dropping {len(self._backlog)} log entries the logging service did not accept")
+            self._backlog.clear()
+
         await self.client.aclose()
 
 
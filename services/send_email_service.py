@@ -1,21 +1,31 @@
+import asyncio
 import os
 import logging
 import ssl
 import certifi
-from typing import Dict, Any
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, List, Optional
+from email.message import EmailMessage
 from pathlib import Path
 
 import aiosmtplib
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateNotFound
 
 from core.config import settings
+from services.smtp_pool import SmtpPool
 from schemas.notification import NotificationRequest, NotificationTask, SupportTicketRequest
 
 
 logger = logging.getLogger(__name__)
 
+# Template rendering and MIME encoding are CPU-bound; run them off the event loop
+_render_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="email-render")
+
+# Loading the CA bundle is expensive; build one TLS context and share it across connections
+_SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
+
 
 class EmailService:
     """Service for sending emails using Gmail SMTP."""
@@ -26,10 +36,52 @@ class EmailService:
         if not template_path.exists():
             raise FileNotFoundError(f"Template directory not found: {template_path}")
         
+        # Persist compiled template bytecode so restarts skip recompiling templates.
+        # Cache files are executed when loaded, so without a configured directory use
+        # Jinja's default, a per-user directory it creates with mode 0o700 and an
+        # ownership check. If no cache directory is usable, run without the cache.
+        try:
+            if settings.template_cache_dir:
+                os.makedirs(settings.template_cache_dir, mode=0o700, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(settings.template_cache_dir, "__jinja2_%s.cache")
+            else:
+                bytecode_cache = FileSystemBytecodeCache()
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Template bytecode cache disabled: {str(e)}")
+            bytecode_cache = None
+
+        # Templates ship with the service and never change at runtime, so keep
+        # every compiled template cached and skip the per-render mtime check
         self.jinja_env = Environment(
             loader=FileSystemLoader(template_path),
-            autoescape=True
+            autoescape=True,
+            auto_reload=False,
+            cache_size=-1,
+            bytecode_cache=bytecode_cache
         )
+
+        # Template per task, resolved once rather than rebuilt per lookup
+        self._template_mapping = {
+            NotificationTask.EMAIL_VERIFICATION: "email_verification.html",
+            NotificationTask.CHANGE_PASSWORD: "change_password.html",
+            NotificationTask.SUPPORT_TICKET: "support_ticket.html"
+        }
+        self._default_template = "email_verification.html"
+
+        # Compile every template the service sends once at startup
+        template_names = {self._get_template_name(task) for task in NotificationTask}
+        template_names.add("support_ticket_confirmation.html")
+        self._templates = {name: self.jinja_env.get_template(name) for name in template_names}
+
+        # Sender header and support recipient are the same for every message
+        self._from_header = f"{settings.from_name} <{settings.from_email}>"
+        self._support_team_email = settings.support_team_email
+
+        # SMTP connection settings only depend on configuration, so resolve them once
+        self._connection_params = self._build_connection_params()
+
+        # Authenticated SMTP sessions are kept open and reused between sends
+        self.smtp_pool = SmtpPool(self._connection_params, size=settings.smtp_pool_size)
         
     async def send_notification_email(self, request: NotificationRequest) -> Dict[str, Any]:
         """
@@ -42,33 +94,11 @@ class EmailService:
             Dict containing success status and message
         """
         try:
-            # Get the appropriate template based on task type
-            template_name = self._get_template_name(request.task)
-
-            # Render the email content with appropriate context
-            if request.task == NotificationTask.SUPPORT_TICKET and isinstance(request, SupportTicketRequest):
-                # For support tickets, include all ticket-specific fields
-                context = {
-                    "user_name": request.user_name,
-                    "link": request.link,
-                    "user_email": request.user_email,
-                    "category": request.category,
-                    "ticket_id": request.ticket_id,
-                    "priority": request.priority,
-                    "description": request.description
-                }
-
-                # Only include due_date if provided
-                if hasattr(request, 'due_date') and request.due_date:
-                    context["due_date"] = request.due_date
-
-                html_content = await self._render_template(template_name, context)
-            else:
-                # For other notification types, use basic context
-                html_content = await self._render_template(template_name, {
-                    "user_name": request.user_name,
-                    "link": request.link
-                })
+            # Render the email content with the template for the task type
+            html_content = await self._render_template(
+                self._get_template_name(request.task),
+                self._notification_context(request)
+            )
 
             # Create and send the email
             await self._send_email(
@@ -94,38 +124,158 @@ class EmailService:
                 "task": request.task
             }
 
+    async def send_many(self, requests: List[NotificationRequest]) -> List[Dict[str, Any]]:
+        """
+        Send several notification emails over a single pooled SMTP connection.
+
+        All templates are rendered concurrently, then the messages are sent back to
+        back on one live session instead of acquiring a connection per email.
+
+        Args:
+            requests: NotificationRequests to send
+
+        Returns:
+            List of result dicts (as returned by send_notification_email), in request order
+        """
+        if not requests:
+            return []
+
+        rendered = await asyncio.gather(
+            *[
+                self._render_template(self._get_template_name(request.task), self._notification_context(request))
+                for request in requests
+            ],
+            return_exceptions=True
+        )
+
+        # Emails whose template failed to render are reported without being sent
+        errors: List[Optional[BaseException]] = [
+            html_content if isinstance(html_content, BaseException) else None
+            for html_content in rendered
+        ]
+        pending = [index for index, error in enumerate(errors) if error is None]
+
+        loop = asyncio.get_running_loop()
+        built = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    _render_pool, self._build_message, requests[index].email, requests[index].subject, rendered[index]
+                )
+                for index in pending
+            ],
+            return_exceptions=True
+        )
+
+        # Emails whose message could not be built (e.g. invalid header values) are reported the same way
+        messages = []
+        for index, message in zip(pending, built):
+            if isinstance(message, BaseException):
+                errors[index] = message
+            else:
+                messages.append(message)
+        pending = [index for index in pending if errors[index] is None]
+
+        # Send back to back on one session. A session the server has dropped (e.g. a
+        # stale pooled connection) is replaced and the unsent messages continue on the
+        # new one; like SmtpPool.send_message, a message is retried on a fresh session once.
+        unsent = deque(zip(pending, messages))
+        reconnected = False
+        while unsent:
+            try:
+                async with self.smtp_pool.connection() as smtp:
+                    while unsent:
+                        index, message = unsent[0]
+                        if not smtp.is_connected:
+                            raise aiosmtplib.SMTPServerDisconnected("SMTP connection lost during batch")
+                        try:
+                            await smtp.send_message(message)
+                            reconnected = False
+                        except aiosmtplib.SMTPServerDisconnected:
+                            raise
+                        except Exception as e:
+                            logger.error(f"SMTP error: {str(e)}")
+                            errors[index] = e
+                        unsent.popleft()
+            except aiosmtplib.SMTPServerDisconnected as e:
+                if not reconnected:
+                    logger.info("SMTP connection was closed by the server, reconnecting")
+                    reconnected = True
+                    continue
+                logger.error(f"SMTP error: {str(e)}")
+                for index, _ in unsent:
+                    errors[index] = e
+                break
+            except Exception as e:
+                # Could not get a connection; every unsent email failed
+                logger.error(f"SMTP error: {str(e)}")
+                for index, _ in unsent:
+                    errors[index] = e
+                break
+
+        results = []
+        for request, error in zip(requests, errors):
+            if error is None:
+                logger.info(f"Email sent successfully to {request.email} for task {request.task}")
+                results.append({
+                    "success": True,
+                    "message": "Email sent successfully",
+                    "email": request.email,
+                    "task": request.task
+                })
+            else:
+                logger.error(f"Failed to send email to {request.email}: {str(error)}")
+                results.append({
+                    "success": False,
+                    "message": f"Failed to send email: {str(error)}",
+                    "email": request.email,
+                    "task": request.task
+                })
+        return results
+
     async def send_support_ticket_emails(self, request: SupportTicketRequest) -> Dict[str, Any]:
         """
         Send both confirmation email to user and notification email to support team for support tickets.
 
+        The two emails are independent, so they are sent concurrently.
+
         Args:
             request: SupportTicketRequest containing ticket details
 
         Returns:
             Dict containing success status and results for both emails
         """
-        results = {
-            "success": True,
-            "message": "Support ticket emails processed",
-            "user_email_result": None,
-            "support_email_result": None
-        }
+        # Both emails share the ticket fields and differ only in the recipient name
+        base_context = self._ticket_context(request)
+        user_result, support_result = await asyncio.gather(
+            self._send_user_confirmation(request, {**base_context, "user_name": request.user_name}),
+            # Different recipient name for support team
+            self._send_support_notification(request, {**base_context, "user_name": "Support Team"}),
+            return_exceptions=True
+        )
 
-        try:
-            # Send confirmation email to user
-            user_context = {
-                "user_name": request.user_name,
-                "link": request.link,
-                "user_email": request.user_email,
-                "category": request.category,
-                "ticket_id": request.ticket_id,
-                "priority": request.priority,
-                "description": request.description
+        if isinstance(user_result, BaseException):
+            user_result = {
+                "success": False,
+                "message": f"Failed to send confirmation email: {str(user_result)}",
+                "email": request.user_email
+            }
+        if isinstance(support_result, BaseException):
+            support_result = {
+                "success": False,
+                "message": f"Failed to send notification email: {str(support_result)}",
+                "email": self._support_team_email
             }
 
-            if hasattr(request, 'due_date') and request.due_date:
-                user_context["due_date"] = request.due_date
+        return {
+            "success": user_result["success"] and support_result["success"],
+            "message": "Support ticket emails processed",
+            "user_email_result": user_result,
+            "support_email_result": support_result
+        }
 
+    async def _send_user_confirmation(self, request: SupportTicketRequest, user_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Send the support ticket confirmation email to the user."""
+        try:
             user_html_content = await self._render_template("support_ticket_confirmation.html", user_context)
 
             await self._send_email(
@@ -134,73 +284,80 @@ class EmailService:
                 html_content=user_html_content
             )
 
-            results["user_email_result"] = {
+            logger.info(f"Confirmation email sent to user {request.user_email} for ticket {request.ticket_id}")
+            return {
                 "success": True,
                 "message": "Confirmation email sent to user",
                 "email": request.user_email
             }
 
-            logger.info(f"Confirmation email sent to user {request.user_email} for ticket {request.ticket_id}")
-
         except Exception as e:
             logger.error(f"Failed to send confirmation email to user {request.user_email}: {str(e)}")
-            results["user_email_result"] = {
+            return {
                 "success": False,
                 "message": f"Failed to send confirmation email: {str(e)}",
                 "email": request.user_email
             }
-            results["success"] = False
 
+    async def _send_support_notification(self, request: SupportTicketRequest, support_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Send the support ticket notification email to the support team."""
         try:
-            # Send notification email to support team
-            support_context = {
-                "user_name": "Support Team",  # Different recipient name for support team
-                "link": request.link,
-                "user_email": request.user_email,
-                "category": request.category,
-                "ticket_id": request.ticket_id,
-                "priority": request.priority,
-                "description": request.description
-            }
-
-            if hasattr(request, 'due_date') and request.due_date:
-                support_context["due_date"] = request.due_date
-
             support_html_content = await self._render_template("support_ticket.html", support_context)
 
             await self._send_email(
-                to_email=settings.support_team_email,
+                to_email=self._support_team_email,
                 subject=request.subject,
                 html_content=support_html_content
             )
 
-            results["support_email_result"] = {
+            logger.info(f"Notification email sent to support team {self._support_team_email} for ticket {request.ticket_id}")
+            return {
                 "success": True,
                 "message": "Notification email sent to support team",
-                "email": settings.support_team_email
+                "email": self._support_team_email
             }
 
-            logger.info(f"Notification email sent to support team {settings.support_team_email} for ticket {request.ticket_id}")
-
         except Exception as e:
-            logger.error(f"Failed to send notification email to support team {settings.support_team_email}: {str(e)}")
-            results["support_email_result"] = {
+            logger.error(f"Failed to send notification email to support team {self._support_team_email}: {str(e)}")
+            return {
                 "success": False,
                 "message": f"Failed to send notification email: {str(e)}",
-                "email": settings.support_team_email
+                "email": self._support_team_email
             }
-            results["success"] = False
-
-        return results
     
+    @staticmethod
+    def _ticket_context(request: SupportTicketRequest) -> Dict[str, Any]:
+        """Build the support ticket template fields shared by every ticket email (all but user_name)."""
+        context = {
+            "link": request.link,
+            "user_email": request.user_email,
+            "category": request.category,
+            "ticket_id": request.ticket_id,
+            "priority": request.priority,
+            "description": request.description
+        }
+
+        # Only include due_date if provided
+        if request.due_date:
+            context["due_date"] = request.due_date
+
+        return context
+
+    def _notification_context(self, request: NotificationRequest) -> Dict[str, Any]:
+        """Build the template context for a notification email."""
+        if request.task == NotificationTask.SUPPORT_TICKET and isinstance(request, SupportTicketRequest):
+            # For support tickets, include all ticket-specific fields
+            return {**self._ticket_context(request), "user_name": request.user_name}
+
+        # For other notification types, use basic context
+        return {
+            "user_name": request.user_name,
+            "link": request.link
+        }
+
     def _get_template_name(self, task: NotificationTask) -> str:
         """Get template filename based on notification task."""
-        template_mapping = {
-            NotificationTask.EMAIL_VERIFICATION: "email_verification.html",
-            NotificationTask.CHANGE_PASSWORD: "change_password.html",
-            NotificationTask.SUPPORT_TICKET: "support_ticket.html"
-        }
-        return template_mapping.get(task, "email_verification.html")
+        return self._template_mapping.get(task, self._default_template)
     
     async def _render_template(self, template_name: str, context: Dict[str, Any]) -> str:
         """
@@ -214,8 +371,9 @@ class EmailService:
             Rendered HTML content
         """
         try:
-            template = self.jinja_env.get_template(template_name)
-            return template.render(**context)
+            template = self._templates.get(template_name) or self.jinja_env.get_template(template_name)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_render_pool, partial(template.render, **context))
         except TemplateNotFound:
             logger.error(f"Template not found: {template_name}")
             raise
@@ -223,6 +381,17 @@ class EmailService:
             logger.error(f"Error rendering template {template_name}: {str(e)}")
             raise
     
+    def _build_message(self, to_email: str, subject: str, html_content: str) -> EmailMessage:
+        """Build the message for an HTML email."""
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = self._from_header
+        message["To"] = to_email
+
+        # HTML is the only part, so send it as text/html without a multipart wrapper
+        message.set_content(html_content, subtype="html")
+        return message
+
     async def _send_email(self, to_email: str, subject: str, html_content: str) -> None:
         """
         Send email using Gmail SMTP.
@@ -233,52 +402,54 @@ class EmailService:
             html_content: HTML content of the email
         """
         # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = f"{settings.from_name} <{settings.from_email}>"
-        message["To"] = to_email
-        
-        # Add HTML content
-        html_part = MIMEText(html_content, "html")
-        message.attach(html_part)
+        loop = asyncio.get_running_loop()
+        message = await loop.run_in_executor(
+            _render_pool, self._build_message, to_email, subject, html_content
+        )
         
-        # Send email
+        # Send email over a pooled SMTP connection
         try:
-
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            # Prepare connection parameters
-            connection_params = {
-                "hostname": settings.smtp_server,
-                "port": settings.smtp_port,
-                "tls_context": ssl_context,
-            }
-
-            # Add authentication if credentials are provided
-            if settings.smtp_username and settings.smtp_password:
-                connection_params["username"] = settings.smtp_username
-                connection_params["password"] = settings.smtp_password
-
-            # Configure SSL/TLS based on port and settings
-            if settings.smtp_port == 465:
-                # Use SSL for port 465 (implicit SSL)
-                connection_params["use_tls"] = True
-                connection_params["start_tls"] = False
-            elif settings.smtp_port == 587:
-                print("Using STARTTLS for port 587")
-                # Use STARTTLS for port 587
-                connection_params["start_tls"] = True
-                connection_params["use_tls"] = False
-            else:
-                # For other ports (like MailHog on 1025), use plain connection
-                connection_params["use_tls"] = False
-                connection_params["start_tls"] = False
-
-            await aiosmtplib.send(message, **connection_params)
+            await self.smtp_pool.send_message(message)
 
         except Exception as e:
             logger.error(f"SMTP error: {str(e)}")
             raise
 
+    def _build_connection_params(self) -> Dict[str, Any]:
+        """Build aiosmtplib connection parameters for SMTP connections."""
+        # Prepare connection parameters
+        connection_params = {
+            "hostname": settings.smtp_server,
+            "port": settings.smtp_port,
+            "tls_context": _SSL_CONTEXT,
+        }
+
+        # Add authentication if credentials are provided
+        if settings.smtp_username and settings.smtp_password:
+            connection_params["username"] = settings.smtp_username
+            connection_params["password"] = settings.smtp_password
+
+        # Configure SSL/TLS based on port and settings
+        if settings.smtp_port == 465:
+            # Use SSL for port 465 (implicit SSL)
+            connection_params["use_tls"] = True
+            connection_params["start_tls"] = False
+        elif settings.smtp_port == 587:
+            logger.debug("Using STARTTLS for port 587")
+            # Use STARTTLS for port 587
+            connection_params["start_tls"] = True
+            connection_params["use_tls"] = False
+        else:
+            # For other ports (like MailHog on 1025), use plain connection
+            connection_params["use_tls"] = False
+            connection_params["start_tls"] = False
+
+        return connection_params
+
+    async def close(self) -> None:
+        """Close pooled SMTP connections."""
+        await self.smtp_pool.close()
+
 
 # Global email service instance
 email_service = EmailService()
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import aiosmtplib
+
+
+logger = logging.getLogger(__name__)
+
+
+class SmtpPool:
+    """Pool of connected, authenticated SMTP sessions reused across sends."""
+
+    def __init__(
+        self,
+        connection_params: Dict[str, Any],
+        size: int = 5,
+        noop_interval: int = 50,
+        idle_timeout: float = 100.0
+    ):
+        """
+        Initialize the pool. Connections are opened lazily on first use.
+
+        Args:
+            connection_params: aiosmtplib.SMTP keyword arguments used for every connection
+            size: Maximum number of open SMTP connections
+            noop_interval: Number of sends after which an idle connection is checked with NOOP
+            idle_timeout: Seconds after which an idle connection is closed instead of reused
+                (servers commonly drop sessions idle for a few minutes)
+        """
+        self._connection_params = connection_params
+        self._size = size
+        self._noop_interval = noop_interval
+        self._idle_timeout = idle_timeout
+        self._slots = asyncio.Semaphore(size)
+        # Idle connections with the number of sends since their last health check
+        # and the time they were returned. LIFO keeps the most recently used
+        # (warmest) connection in rotation.
+        self._idle: asyncio.LifoQueue[Tuple[aiosmtplib.SMTP, int, float]] = asyncio.LifoQueue(maxsize=size)
+
+    async def send_message(self, message) -> None:
+        """
+        Send a message over a pooled connection.
+
+        A connection the server has dropped is replaced once and the send retried.
+        """
+        smtp, sends = await self._acquire()
+        try:
+            try:
+                await smtp.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                logger.info("SMTP connection was closed by the server, reconnecting")
+                await self._discard(smtp)
+                smtp, sends = await self._connect(), 0
+                await smtp.send_message(message)
+        except BaseException:
+            await self._discard(smtp)
+            self._slots.release()
+            raise
+
+        self._release(smtp, sends + 1)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """
+        Hold a pooled connection for several commands, e.g. sending a batch of messages.
+
+        The connection is returned to the pool on exit, or closed if the block raised.
+        """
+        smtp, sends = await self._acquire()
+        try:
+            yield smtp
+        except BaseException:
+            await self._discard(smtp)
+            self._slots.release()
+            raise
+
+        self._release(smtp, sends + 1)
+
+    async def close(self) -> None:
+        """Close all idle connections."""
+        connections: List[aiosmtplib.SMTP] = []
+        while not self._idle.empty():
+            smtp, _, _ = self._idle.get_nowait()
+            connections.append(smtp)
+
+        for smtp in connections:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+    async def _acquire(self) -> Tuple[aiosmtplib.SMTP, int]:
+        """Take an idle connection from the pool, opening a new one if none is available."""
+        await self._slots.acquire()
+        try:
+            while not self._idle.empty():
+                smtp, sends, released_at = self._idle.get_nowait()
+                if not smtp.is_connected:
+                    continue
+                if time.monotonic() - released_at > self._idle_timeout:
+                    await self._discard(smtp)
+                    continue
+                if sends < self._noop_interval:
+                    return smtp, sends
+                try:
+                    await smtp.noop()
+                    return smtp, 0
+                except aiosmtplib.SMTPException:
+                    await self._discard(smtp)
+
+            return await self._connect(), 0
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, smtp: aiosmtplib.SMTP, sends: int) -> None:
+        """Return a connection to the pool, dropping it if the server has closed it."""
+        if smtp.is_connected:
+            self._idle.put_nowait((smtp, sends, time.monotonic()))
+        self._slots.release()
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        """Open a new SMTP connection (TLS/STARTTLS and login are handled by connect)."""
+        smtp = aiosmtplib.SMTP(**self._connection_params)
+        await smtp.connect()
+        return smtp
+
+    @staticmethod
+    async def _discard(smtp: aiosmtplib.SMTP) -> None:
+        """Close a connection that should not be reused."""
+        if smtp.is_connected:
+            smtp.close()